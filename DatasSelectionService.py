@@ -1,404 +1,641 @@
-import logging
-import time
-import pandas as pd
-import matplotlib
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-
-from Utilities import DatePickerUtil
-
-
-class DataSelectionConfig:
-    """
-    Clase que contiene la configuración relevante para la selección de datos:
-    - URL de la página donde se hace la selección (url_analysis).
-    - XPaths de los elementos clave (botón diario, botón siguiente, tabla, etc.).
-    """
-    def __init__(
-        self,
-        url_analysis: str,
-        daily_button_xpath: str,
-        date_picker_xpath: str,
-        typology_select_xpath: str,
-        next_button_xpath: str,
-        confirm_button_xpath: str,
-        table_xpath: str,
-        pagination_next_xpath: str
-    ):
-        self.url_analysis = url_analysis
-        self.daily_button_xpath = daily_button_xpath
-        self.date_picker_xpath = date_picker_xpath  # Opcional si quisieras localizar el datepicker
-        self.typology_select_xpath = typology_select_xpath
-        self.next_button_xpath = next_button_xpath
-        self.confirm_button_xpath = confirm_button_xpath
-        self.table_xpath = table_xpath
-        self.pagination_next_xpath = pagination_next_xpath
-
-
-class DataSelectionService:
-    """
-    Servicio para:
-    1. Acceder a la url de análisis.
-    2. Seleccionar la vista diaria (u otra).
-    3. Elegir la fecha (day, month, year).
-    4. Seleccionar la tipología, elementos y parámetros.
-    5. Extraer una tabla paginada y guardarla en CSV (si se requiere).
-
-    Parámetros:
-    -----------
-    driver : WebDriver
-        Instancia inicializada de Selenium WebDriver
-    config : DataSelectionConfig
-        Objeto con los XPaths y la URL de análisis
-    typology_dict : dict
-        Diccionario que mapea la 'typology' a sus XPaths (ver 'Typology.Typology' original)
-    wait_time : int
-        Tiempo máximo de espera por defecto para WebDriverWait
-    day : int
-        Día a seleccionar
-    month : str
-        Mes a seleccionar (por ejemplo "febrero")
-    year : int
-        Año a seleccionar
-    elements : list[str]
-        Lista de elementos a marcar
-    parameters : list[str]
-        Lista de parámetros a marcar
-    typology_key : str
-        La clave de tipología, p.ej. "Inversor - (INVERSOR)"
-    """
-
-    def __init__(
-        self,
-        driver,
-        config: DataSelectionConfig,
-        typology_dict: dict,
-        wait_time: int = 10,
-        day: int = 1,
-        month: str = "febrero",
-        year: int = 2025,
-        elements: list[str] = None,
-        parameters: list[str] = None,
-        typology_key: str = "Inversor - (INVERSOR)"
-    ):
-        self.driver = driver
-        self.config = config
-        self.typology_dict = typology_dict
-        self.wait_time = wait_time
-        self.day = day
-        self.month = month
-        self.year = year
-        self.elements = elements or []
-        self.parameters = parameters or []
-        self.typology_key = typology_key
-
-    def select_data(self):
-        """
-        Selecciona la vista diaria, la fecha, la tipología,
-        los elementos y los parámetros configurados.
-        Luego, puede extraer la tabla resultante.
-        """
-        try:
-            logging.info("Navegando a la página de análisis...")
-            self.driver.get(self.config.url_analysis)
-
-            wait = WebDriverWait(self.driver, self.wait_time)
-
-            # Seleccionar botón para visualizar datos diarios
-            logging.info("Seleccionando vista diaria...")
-            day_button = wait.until(EC.element_to_be_clickable((By.XPATH, self.config.daily_button_xpath)))
-            self.checked_click(day_button)
-
-            # Seleccionar la fecha con el utilitario
-            logging.info(f"Seleccionando la fecha: {self.day}-{self.month}-{self.year}")
-            DatePickerUtil.select_date(self.driver, self.day, self.month, self.year)
-            # Puede que se requiera un sleep
-            # Pendiente: se usaría WebDriverWait con alguna condición que indique que la tabla se refrescó.
-            time.sleep(2)
-
-            # Seleccionar tipología
-            logging.info(f"Seleccionando tipología: {self.typology_key}")
-            typology_element = wait.until(
-                EC.presence_of_element_located((By.XPATH, self.config.typology_select_xpath))
-            )
-            select_typology = Select(typology_element)
-            select_typology.select_by_visible_text(self.typology_key)
-
-            # Esperar a que se actualice la página
-            # Pendiente: Cambiar a un "wait_for_page_loaded"
-            time.sleep(2)
-
-            # Seleccionar elementos
-            self._select_elements(wait)
-
-            # Seleccionar parámetros
-            self._select_parameters(wait)
-
-            # Botón siguiente (OK)
-            logging.info("Pulsando botón 'OK' para continuar...")
-            next_button = wait.until(EC.element_to_be_clickable((By.XPATH, self.config.next_button_xpath)))
-            self.checked_click(next_button)
-            time.sleep(2)
-
-            #Extraer la tabla resultante
-            self._extract_table(wait, self.config.table_xpath, self.config.pagination_next_xpath)
-
-            # Confirmar datos
-            try:
-                confirm_button = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, self.config.confirm_button_xpath))
-                )
-                self.checked_click(confirm_button)
-            except Exception:
-                logging.info("No se encontró el último botón de confirmación, saltando paso...")
-
-            logging.info("Selección de datos completada.")
-        except Exception as e:
-            logging.error("Error en select_data.", exc_info=True)
-            raise
-
-    def _select_elements(self, wait: WebDriverWait):
-        """
-        Marca los checkboxes correspondientes a los 'elements' configurados,
-        usando el diccionario 'Typology' para resolver el XPATH.
-        """
-        if not self.elements:
-            return
-        for element_name in self.elements:
-            xpath = self.typology_dict[self.typology_key]['Elements'].get(element_name)
-            if not xpath:
-                logging.warning(f"No se encontró el XPATH para el elemento '{element_name}'.")
-                continue
-            elem_checkbox = wait.until(EC.presence_of_element_located((By.XPATH, xpath)))
-            self.checked_click(elem_checkbox)
-            time.sleep(0.5)  # Pequeña pausa para permitir que la interfaz se actualice
-
-    def _select_parameters(self, wait: WebDriverWait):
-        """
-        Marca los checkboxes correspondientes a los 'parameters' configurados,
-        usando el diccionario 'Typology' para resolver el XPATH.
-        """
-        if not self.parameters:
-            return
-        for param_name in self.parameters:
-            xpath = self.typology_dict[self.typology_key]['Parameters'].get(param_name)
-            if not xpath:
-                logging.warning(f"No se encontró el XPATH para el parámetro '{param_name}'.")
-                continue
-            param_checkbox = wait.until(EC.presence_of_element_located((By.XPATH, xpath)))
-            self.checked_click(param_checkbox)
-            time.sleep(0.5)
-
-    def _extract_table(self, wait: WebDriverWait, pagination_next_xpath: str, table_xpath ='//table[contains(@class, "table")]'):
-        """
-        Extrae la tabla paginada y la guarda en CSV.
-        Este método se puede separar en otra clase si lo deseas.
-        """
-        logging.info("Iniciando extracción de tabla...")
-        data = []
-
-        # Esperar a que aparezca la tabla
-        table_element = wait.until(EC.presence_of_element_located((By.XPATH, table_xpath)))
-
-        # Se obtienen los headers
-        header_elements = table_element.find_elements(By.XPATH, './/thead//th')
-        headers = [header.text.strip() for header in header_elements if header.text.strip()]
-
-        while True:
-            # Re-obtener la tabla en cada página para asegurarse de que los elementos se actualicen
-            table_element = wait.until(EC.presence_of_element_located((By.XPATH, table_xpath)))
-            rows = table_element.find_elements(By.XPATH, './/tbody/tr')
-
-            for row in rows:
-                cells = row.find_elements(By.XPATH, './td')
-                values = [cell.text.strip() for cell in cells]
-                data.append(values)
-
-            # Intentar pulsar el botón de siguiente en la paginación
-            try:
-                next_button = self.driver.find_element(By.XPATH, pagination_next_xpath)
-                # Verificar si está inhabilitado o no. Asumiendo que se usa la clase "disabled" o similar
-                if 'disabled' in next_button.get_attribute('class'):
-                    break  # No hay más páginas
-                self.checked_click(next_button)
-                # Esperar a que la nueva página se cargue
-                time.sleep(1)
-            except Exception:
-                # Si no existe el botón o no es clickable, se asume fin de paginación
-                break
-
-        # Guardar en CSV
-        df = pd.DataFrame(data, columns=headers if headers else None)
-        file_name = f"Data_{self.typology_key}_{self.day}_{self.month}_{self.year}.csv"
-        df.to_csv(file_name, index=False)
-        logging.info(f"Tabla extraída y guardada en: {file_name}")
-
-    def checked_click(self, element):
-        """
-        Hace click en un checkbox o botón solo si no está ya seleccionado.
-        """
-        # Para checkboxes: si no está seleccionado, haz click.
-        # Para botones: normalmente no tienen "is_selected", se puede hacer click directo
-        try:
-            if hasattr(element, 'is_selected') and element.is_selected():
-                return
-            element.click()
-        except Exception as e:
-            logging.error("Error al hacer click en el elemento.", exc_info=True)
-            raise
-
-
-class Parameters:
-    Parameters_inv = {
-        "CALIDAD COM": '//*[@id="quick-analysis"]//span[contains(text(),"CALIDAD COM")]/parent::label',
-        "CORRIENTE AC FASE 1": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE AC FASE 1")]/parent::label',
-        "CORRIENTE AC FASE 2": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE AC FASE 2")]/parent::label',
-        "CORRIENTE AC FASE 3": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE AC FASE 3")]/parent::label',
-        "CORRIENTE DC": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC")]/parent::label',
-        "CORRIENTE DC IN 01": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 01")]/parent::label',
-        "CORRIENTE DC IN 02": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 02")]/parent::label',
-        "CORRIENTE DC IN 03": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 03")]/parent::label',
-        "CORRIENTE DC IN 04": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 04")]/parent::label',
-        "CORRIENTE DC IN 05": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 05")]/parent::label',
-        "CORRIENTE DC IN 06": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 06")]/parent::label',
-        "CORRIENTE DC IN 07": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 07")]/parent::label',
-        "CORRIENTE DC IN 08": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 08")]/parent::label',
-        "CORRIENTE DC IN 09": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 09")]/parent::label',
-        "CORRIENTE DC IN 10": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 10")]/parent::label',
-        "CORRIENTE DC IN 11": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 11")]/parent::label',
-        "CORRIENTE DC IN 12": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 12")]/parent::label',
-        "CORRIENTE DC IN 13": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 13")]/parent::label',
-        "CORRIENTE DC IN 14": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 14")]/parent::label',
-        "CORRIENTE DC IN 15": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 15")]/parent::label',
-        "CORRIENTE DC IN 16": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 16")]/parent::label',
-        "CORRIENTE DC IN 17": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 17")]/parent::label',
-        "CORRIENTE DC IN 18": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 18")]/parent::label',
-        "CORRIENTE DC IN 19": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 19")]/parent::label',
-        "CORRIENTE DC IN 20": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 20")]/parent::label',
-        "CORRIENTE DC IN 21": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 21")]/parent::label',
-        "CORRIENTE DC IN 22": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 22")]/parent::label',
-        "CORRIENTE DC IN 23": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 23")]/parent::label',
-        "CORRIENTE DC IN 24": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 24")]/parent::label',
-        "CORRIENTE DC IN 25": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 25")]/parent::label',
-        "CORRIENTE DC IN 26": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 26")]/parent::label',
-        "CORRIENTE DC IN 27": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 27")]/parent::label',
-        "CORRIENTE DC IN 28": '//*[@id="quick-analysis"]//span[contains(text(),"CORRIENTE DC IN 28")]/parent::label',
- 
-        "DURACION ULTIMO MUESTREO": '//*[@id="quick-analysis"]//span[contains(text(),"DURACION ULTIMO MUESTREO")]/parent::label',
-        "EFICIENCIA": '//*[@id="quick-analysis"]//span[contains(text(),"EFICIENCIA")]/parent::label',
-        "ENERGIA ACTIVA": '//*[@id="quick-analysis"]//span[contains(text(),"ENERGIA ACTIVA")]/parent::label',
-        "ENERGIA ACTIVA AÑO": '//*[@id="quick-analysis"]//span[contains(text(),"ENERGIA ACTIVA AÑO")]/parent::label',
-        "ENERGIA ACTIVA DIA": '//*[@id="quick-analysis"]//span[contains(text(),"ENERGIA ACTIVA DIA")]/parent::label',
-        "ENERGIA ACTIVA MES": '//*[@id="quick-analysis"]//span[contains(text(),"ENERGIA ACTIVA MES")]/parent::label',
-        "ESTADO COM": '//*[@id="quick-analysis"]//span[contains(text(),"ESTADO COM")]/parent::label',
-        "FACTOR DE POTENCIA": '//*[@id="quick-analysis"]//span[contains(text(),"FACTOR DE POTENCIA")]/parent::label',
-        "FECHA": '//*[@id="quick-analysis"]//span[contains(text(),"FECHA")]/parent::label',
-        "FECHA ULTIMA LECTURA": '//*[@id="quick-analysis"]//span[contains(text(),"FECHA ULTIMA LECTURA")]/parent::label',
-        "FRECUENCIA": '//*[@id="quick-analysis"]//span[contains(text(),"FRECUENCIA")]/parent::label',
-        "HUAWEI SMARTLOGGER AJUSTE ACTIVO": '//*[@id="quick-analysis"]//span[contains(text(),"HUAWEI SMARTLOGGER AJUSTE ACTIVO")]/parent::label',
-        "HUAWEI SMARTLOGGER CAPACIDAD NOMINAL PLANTA": '//*[@id="quick-analysis"]//span[contains(text(),"HUAWEI SMARTLOGGER CAPACIDAD NOMINAL PLANTA")]/parent::label',
-        "HUAWEI SMARTLOGGER ESTADO COMUNICACIONES": '//*[@id="quick-analysis"]//span[contains(text(),"HUAWEI SMARTLOGGER ESTADO COMUNICACIONES")]/parent::label',
-        "HUAWEI SUN2000 ESTADO": '//*[@id="quick-analysis"]//span[contains(text(),"HUAWEI SUN2000 ESTADO")]/parent::label',
-        "HUAWEI SUN2000 TELEINDICACION": '//*[@id="quick-analysis"]//span[contains(text(),"HUAWEI SUN2000 TELEINDICACION")]/parent::label',
-        "MARCA": '//*[@id="quick-analysis"]//span[contains(text(),"MARCA")]/parent::label',
-        "MODELO": '//*[@id="quick-analysis"]//span[contains(text(),"MODELO")]/parent::label',
-        "POTENCIA ACTIVA": '//*[@id="quick-analysis"]//span[text()="                                POTENCIA ACTIVA                            "]/parent::label',
-        "POTENCIA DC": '//*[@id="quick-analysis"]//span[contains(text(),"POTENCIA DC")]/parent::label',
-        "POTENCIA NOMINAL": '//*[@id="quick-analysis"]//span[contains(text(),"POTENCIA NOMINAL")]/parent::label',
-        "RESISTENCIA AISLAMIENTO": '//*[@id="quick-analysis"]//span[contains(text(),"RESISTENCIA AISLAMIENTO")]/parent::label',
-        "SETPOINT FACTOR DE POTENCIA": '//*[@id="quick-analysis"]//span[contains(text(),"SETPOINT FACTOR DE POTENCIA")]/parent::label',
-        "TEMPERATURA INT": '//*[@id="quick-analysis"]//span[contains(text(),"TEMPERATURA INT")]/parent::label',
-        "TENSIÓN AC FASE 1-2": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN AC FASE 1-2")]/parent::label',
-        "TENSIÓN AC FASE 1-N": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN AC FASE 1-N")]/parent::label',
-        "TENSIÓN AC FASE 2-3": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN AC FASE 2-3")]/parent::label',
-        "TENSIÓN AC FASE 2-N": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN AC FASE 2-N")]/parent::label',
-        "TENSIÓN AC FASE 3-1": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN AC FASE 3-1")]/parent::label',
-        "TENSIÓN AC FASE 3-N": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN AC FASE 3-N")]/parent::label',
-        "TENSIÓN DC IN 01": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 01")]/parent::label',
-        "TENSIÓN DC IN 02": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 02")]/parent::label',
-        "TENSIÓN DC IN 03": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 03")]/parent::label',
-        "TENSIÓN DC IN 04": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 04")]/parent::label',
-        "TENSIÓN DC IN 05": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 05")]/parent::label',
-        "TENSIÓN DC IN 06": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 06")]/parent::label',
-        "TENSIÓN DC IN 07": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 07")]/parent::label',
-        "TENSIÓN DC IN 08": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 08")]/parent::label',
-        "TENSIÓN DC IN 09": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 09")]/parent::label',
-        "TENSIÓN DC IN 10": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 10")]/parent::label',
-        "TENSIÓN DC IN 11": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 11")]/parent::label',
-        "TENSIÓN DC IN 12": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 12")]/parent::label',
-        "TENSIÓN DC IN 13": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 13")]/parent::label',
-        "TENSIÓN DC IN 14": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 14")]/parent::label',
-        "TENSIÓN DC IN 15": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 15")]/parent::label',
-        "TENSIÓN DC IN 16": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 16")]/parent::label',
-        "TENSIÓN DC IN 17": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 17")]/parent::label',
-        "TENSIÓN DC IN 18": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 18")]/parent::label',
-        "TENSIÓN DC IN 19": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 19")]/parent::label',
-        "TENSIÓN DC IN 20": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 20")]/parent::label',
-        "TENSIÓN DC IN 21": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 21")]/parent::label',
-        "TENSIÓN DC IN 22": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 22")]/parent::label',
-        "TENSIÓN DC IN 23": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 23")]/parent::label',
-        "TENSIÓN DC IN 24": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 24")]/parent::label',
-        "TENSIÓN DC IN 25": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 25")]/parent::label',
-        "TENSIÓN DC IN 26": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 26")]/parent::label',
-        "TENSIÓN DC IN 27": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 27")]/parent::label',
-        "TENSIÓN DC IN 28": '//*[@id="quick-analysis"]//span[contains(text(),"TENSIÓN DC IN 28")]/parent::label'
-    }
-    Parameters_meteo = {
-        "PYRANOMETER 1 IRRADIANCE": '//*[@id="quick-analysis"]//span[contains(text(),"PYRANOMETER 1 IRRADIANCE")]/parent::label',
-        "PYRANOMETER 2 IRRADIANCE": '//*[@id="quick-analysis"]//span[contains(text(),"PYRANOMETER 2 IRRADIANCE")]/parent::label',
-        "PYRANOMETER 3 IRRADIANCE": '//*[@id="quick-analysis"]//span[contains(text(),"PYRANOMETER 3 IRRADIANCE")]/parent::label',
-        "RELATIVE HUMIDITY": '//*[@id="quick-analysis"]//span[contains(text(),"RELATIVE HUMIDITY")]/parent::label',
-        "AIR PRESSURE": '//*[@id="quick-analysis"]//span[contains(text(),"AIR PRESSURE")]/parent::label',
-        "AMBIENT TEMPERATURE": '//*[@id="quick-analysis"]//span[contains(text(),"AMBIENT TEMPERATURE")]/parent::label',
-        "WIND DIRECTION ACTUAL": '//*[@id="quick-analysis"]//span[contains(text(),"WIND DIRECTION ACTUAL")]/parent::label',
-        "PYRANOMETER 1 TEMPERATURE": '//*[@id="quick-analysis"]//span[contains(text(),"PYRANOMETER 1 TEMPERATURE")]/parent::label',
-        "PYRANOMETER 2 TEMPERATURE": '//*[@id="quick-analysis"]//span[contains(text(),"PYRANOMETER 2 TEMPERATURE")]/parent::label',
-        "PYRANOMETER 3 TEMPERATURE": '//*[@id="quick-analysis"]//span[contains(text(),"PYRANOMETER 3 TEMPERATURE")]/parent::label',
-
-    }
-
-class Elements:
-    Elements = {
-        'Universidad de Panama 1.1': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 1.1")]/parent::label',
-        'UP1 INV1.1-01':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-01")]/parent::label',
-        'UP1 INV1.1-02':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-02")]/parent::label',
-        'UP1 INV1.1-03':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-03")]/parent::label',
-        'UP1 INV1.1-04':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-04")]/parent::label',
-        'UP1 INV1.1-05':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-05")]/parent::label',
-        'UP1 INV1.1-06':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-06")]/parent::label',
-        'UP1 INV1.1-07':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-07")]/parent::label',
-        'UP1 INV1.1-08':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-08")]/parent::label',
-        'UP1 INV1.1-09':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-09")]/parent::label',
-        'UP1 INV1.1-10':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-10")]/parent::label',
-        'UP1 INV1.1-11':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-11")]/parent::label',
-        'UP1 INV1.1-12':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-12")]/parent::label',
-        'UP1 INV1.1-13':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-13")]/parent::label',
-        'UP1 INV1.1-14':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-14")]/parent::label',
-        'UP1 INV1.1-15':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-15")]/parent::label',
-        'UP1 INV1.1-16':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-16")]/parent::label',
-        'UP1 INV1.1-17':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-17")]/parent::label',
-        'UP1 INV1.1-18':'//*[@id="quick-analysis"]//span[contains(text(),"UP1 INV1.1-18")]/parent::label',
-        'Universidad de Panama 1.2': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 1.2")]/parent::label',
-        'UP2 INV1.2-01':'//*[@id="quick-analysis"]//span[contains(text(),"UP2 INV1.2-01")]/parent::label',
-        'Universidad de Panama 2.1': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 2.1")]/parent::label',
-        'Universidad de Panama 2.2': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 2.2")]/parent::label',
-        'Universidad de Panama 3.1': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 3.1")]/parent::label',
-        'Universidad de Panama 3.2': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 3.2")]/parent::label',
-        'Universidad de Panama 4.1': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 4.1")]/parent::label',
-        'Universidad de Panama 4.2': '//*[@id="quick-analysis"]//span[contains(text(),"Universidad Panamá 4.2")]/parent::label',
-    }
-
-class Typology:
-    Typology = {
-        "Inversor - (INVERSOR)": {
-            "Elements": Elements.Elements, # Elementos a seleccionar
-            "Parameters": Parameters.Parameters_inv,  # Parámetros generales
-        },
-        "Estación Meteorológica - (METEO)":{
-            "Elements": Elements.Elements, # Elementos a seleccionar
-            "Parameters": Parameters.Parameters_meteo,  # Parámetros generales
-
-        }
-
-    }
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support import expected_conditions as EC
+
+from Utilities import DatePickerUtil
+
+
+class DataSelectionConfig:
+    """
+    Clase que contiene la configuración relevante para la selección de datos:
+    - URL de la página donde se hace la selección (url_analysis).
+    - XPaths de los elementos clave (botón diario, botón siguiente, tabla, etc.).
+    """
+    def __init__(
+        self,
+        url_analysis: str,
+        daily_button_xpath: str,
+        date_picker_xpath: str,
+        typology_select_xpath: str,
+        next_button_xpath: str,
+        confirm_button_xpath: str,
+        table_xpath: str,
+        pagination_next_xpath: str
+    ):
+        self.url_analysis = url_analysis
+        self.daily_button_xpath = daily_button_xpath
+        self.date_picker_xpath = date_picker_xpath  # Opcional si quisieras localizar el datepicker
+        self.typology_select_xpath = typology_select_xpath
+        self.next_button_xpath = next_button_xpath
+        self.confirm_button_xpath = confirm_button_xpath
+        self.table_xpath = table_xpath
+        self.pagination_next_xpath = pagination_next_xpath
+
+
+class DataSelectionService:
+    """
+    Servicio para:
+    1. Acceder a la url de análisis.
+    2. Seleccionar la vista diaria (u otra).
+    3. Elegir la fecha (day, month, year).
+    4. Seleccionar la tipología, elementos y parámetros.
+    5. Extraer una tabla paginada y guardarla en CSV (si se requiere).
+
+    Parámetros:
+    -----------
+    driver : WebDriver
+        Instancia inicializada de Selenium WebDriver
+    config : DataSelectionConfig
+        Objeto con los XPaths y la URL de análisis
+    typology_dict : dict
+        Diccionario que mapea la 'typology' a sus XPaths (ver 'Typology.Typology' original)
+    wait_time : int
+        Tiempo máximo de espera por defecto para WebDriverWait
+    day : int
+        Día a seleccionar
+    month : str
+        Mes a seleccionar (por ejemplo "febrero")
+    year : int
+        Año a seleccionar
+    elements : list[str]
+        Lista de elementos a marcar
+    parameters : list[str]
+        Lista de parámetros a marcar
+    typology_key : str
+        La clave de tipología, p.ej. "Inversor - (INVERSOR)"
+    output_format : str
+        Formato del archivo de salida: "csv" (portable) o "parquet"
+        (más rápido de escribir y más compacto para tablas grandes).
+    block_resources : bool
+        Si True, bloquea la descarga de imágenes, fuentes y CSS (vía CDP,
+        solo en navegadores Chromium) para acelerar las cargas de página.
+    """
+
+    # Recursos que no afectan al DOM de la tabla pero sí al tiempo de carga
+    _BLOCKED_URL_PATTERNS = [
+        '*.png', '*.jpg', '*.jpeg', '*.gif',
+        '*.woff*', '*.ttf', '*.css'
+    ]
+
+    # Script que marca en una sola llamada todos los checkboxes indicados.
+    # Recibe una lista de pares [nombre, xpath]; hace click en los que no
+    # estén marcados y devuelve los nombres que no se encontraron en el DOM.
+    _BATCH_SELECT_JS = """
+        const pares = arguments[0];
+        // Un solo recorrido del DOM: mapa texto -> label. Evaluar el XPath
+        // contains(text(), ...) por cada nombre recorre el DOM completo una
+        // vez por checkbox; con el mapa cada búsqueda es O(1). El índice se
+        // cachea en window para compartirlo entre llamadas (elementos y
+        // parámetros); _build_label_index lo reconstruye tras un refresco.
+        if (!window.__qaLabels) {
+            window.__qaLabels = new Map();
+            document.querySelectorAll('#quick-analysis label span').forEach(s => {
+                window.__qaLabels.set(s.textContent.trim(), s.parentElement);
+            });
+        }
+        const etiquetas = window.__qaLabels;
+        const noEncontrados = [];
+        for (const [nombre, xpath] of pares) {
+            let nodo = etiquetas.get(nombre);
+            if (nodo && !nodo.isConnected) { nodo = null; }
+            if (!nodo) {
+                // Respaldo: XPath original para textos que no coinciden exacto
+                nodo = document.evaluate(
+                    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+                ).singleNodeValue;
+            }
+            if (!nodo) { noEncontrados.push(nombre); continue; }
+            const input = nodo.querySelector('input') || nodo;
+            if (!input.checked) { nodo.click(); }
+        }
+        return noEncontrados;
+    """
+
+    def __init__(
+        self,
+        driver,
+        config: DataSelectionConfig,
+        typology_dict: dict,
+        wait_time: int = 10,
+        day: int = 1,
+        month: str = "febrero",
+        year: int = 2025,
+        elements: list[str] = None,
+        parameters: list[str] = None,
+        typology_key: str = "Inversor - (INVERSOR)",
+        output_format: str = "csv",
+        block_resources: bool = True
+    ):
+        self.driver = driver
+        self.config = config
+        self.typology_dict = typology_dict
+        self.wait_time = wait_time
+        # Espera compartida por todos los métodos: se construye una sola vez
+        # y usa un poll de 150 ms (el default de 500 ms añade latencia media
+        # de ~250 ms a cada paso que resuelve rápido).
+        self._wait = WebDriverWait(driver, wait_time, poll_frequency=0.15)
+        self.day = day
+        self.month = month
+        self.year = year
+        self.elements = elements or []
+        self.parameters = parameters or []
+        self.typology_key = typology_key
+
+        # Resolver la tipología una sola vez y fallar de inmediato si la
+        # clave no existe, en lugar de dentro de una llamada de Selenium.
+        if typology_dict:
+            try:
+                typology = typology_dict[typology_key]
+            except KeyError:
+                raise KeyError(
+                    f"Tipología '{typology_key}' desconocida. "
+                    f"Opciones válidas: {list(typology_dict)}"
+                ) from None
+            self._elements_xpaths = typology['Elements']
+            self._parameters_xpaths = typology['Parameters']
+        else:
+            self._elements_xpaths = {}
+            self._parameters_xpaths = {}
+
+        if output_format not in ("csv", "parquet"):
+            raise ValueError(
+                f"Formato de salida '{output_format}' no soportado. "
+                "Opciones válidas: 'csv', 'parquet'."
+            )
+        if output_format == "parquet" and not any(
+            importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")
+        ):
+            # Validar el motor aquí y no en to_parquet, que fallaría con
+            # ImportError cuando el scrape completo ya se ejecutó.
+            raise ValueError(
+                "El formato 'parquet' requiere tener instalado 'pyarrow' o "
+                "'fastparquet'."
+            )
+        self.output_format = output_format
+
+        self.block_resources = block_resources
+        if self.driver is not None and self.block_resources:
+            self._configure_perf_prefs()
+
+        # Implicit wait original del driver: se anula durante las esperas
+        # explícitas para que cada sondeo no lo pague también.
+        self._original_implicit = 0
+        if self.driver is not None:
+            try:
+                self._original_implicit = self.driver.timeouts.implicit_wait
+            except WebDriverException:
+                pass
+
+        # Locators (By.XPATH, xpath) precomputados una sola vez, para no
+        # reconstruir las tuplas en cada llamada a wait.until.
+        if config is not None:
+            self._daily_button_loc = (By.XPATH, config.daily_button_xpath)
+            self._typology_select_loc = (By.XPATH, config.typology_select_xpath)
+            self._next_button_loc = (By.XPATH, config.next_button_xpath)
+            self._confirm_button_loc = (By.XPATH, config.confirm_button_xpath)
+
+    @contextlib.contextmanager
+    def _no_implicit(self):
+        """
+        Pone el implicit wait a 0 mientras dura una espera explícita y lo
+        restaura al salir. Si el driver no tiene implicit wait configurado,
+        no hace nada.
+        """
+        if not self._original_implicit:
+            yield
+            return
+        self.driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            self.driver.implicitly_wait(self._original_implicit)
+
+    def _configure_perf_prefs(self):
+        """
+        Bloquea la descarga de imágenes, fuentes y CSS mediante el Chrome
+        DevTools Protocol. Solo aplica en drivers Chromium; en navegadores
+        sin soporte CDP se ignora sin interrumpir el flujo.
+        """
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd(
+                'Network.setBlockedURLs', {'urls': self._BLOCKED_URL_PATTERNS}
+            )
+        except (AttributeError, WebDriverException):
+            logging.info("No se pudieron bloquear recursos (driver sin soporte CDP).")
+
+    def _cdp_eval(self, expression: str):
+        """
+        Evalúa 'expression' directamente vía CDP (Runtime.evaluate), evitando
+        la capa JSON-wire de WebDriver (~5-15 ms por comando). En drivers sin
+        soporte CDP devuelve None y el llamador usa su respaldo de Selenium.
+        """
+        try:
+            result = self.driver.execute_cdp_cmd(
+                'Runtime.evaluate',
+                {'expression': expression, 'returnByValue': True}
+            )
+            return result.get('result', {}).get('value')
+        except (AttributeError, WebDriverException):
+            return None
+
+    def _table_outer_html(self, table_element, table_xpath: str) -> str:
+        """
+        Lee el outerHTML de la tabla vía CDP cuando está disponible; en
+        otros navegadores recurre al get_attribute tradicional.
+        """
+        expression = (
+            "(() => { const n = document.evaluate(" + json.dumps(table_xpath) +
+            ", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)"
+            ".singleNodeValue; return n ? n.outerHTML : null; })()"
+        )
+        html = self._cdp_eval(expression)
+        if html is None:
+            html = table_element.get_attribute('outerHTML')
+        return html
+
+    def select_data(self):
+        """
+        Selecciona la vista diaria, la fecha, la tipología,
+        los elementos y los parámetros configurados.
+        Luego, puede extraer la tabla resultante.
+        """
+        try:
+            logging.info("Navegando a la página de análisis...")
+            self.driver.get(self.config.url_analysis)
+
+            wait = self._wait
+
+            # Seleccionar botón para visualizar datos diarios
+            logging.info("Seleccionando vista diaria...")
+            day_button = wait.until(EC.element_to_be_clickable(self._daily_button_loc))
+            self.checked_click(day_button)
+
+            # Referencia al select de tipología para detectar el refresco tras elegir la fecha
+            typology_ref = wait.until(
+                EC.presence_of_element_located(self._typology_select_loc)
+            )
+
+            # Seleccionar la fecha con el utilitario
+            logging.info(f"Seleccionando la fecha: {self.day}-{self.month}-{self.year}")
+            DatePickerUtil.select_date(self.driver, self.day, self.month, self.year)
+            # Esperar a que la página se refresque (si lo hace) en lugar de un sleep fijo
+            self._wait_for_refresh(typology_ref)
+
+            # Seleccionar tipología (re-localizar por si el refresco invalidó la referencia)
+            logging.info(f"Seleccionando tipología: {self.typology_key}")
+            typology_element = wait.until(
+                EC.presence_of_element_located(self._typology_select_loc)
+            )
+            select_typology = Select(typology_element)
+            select_typology.select_by_visible_text(self.typology_key)
+
+            # Esperar a que se actualice la página tras el cambio de tipología
+            self._wait_for_refresh(typology_element)
+
+            # Reconstruir el índice de labels con el DOM ya refrescado
+            indexed = self._build_label_index()
+            logging.info(f"Índice de labels construido: {indexed} entradas.")
+
+            # Seleccionar elementos
+            self._select_elements()
+
+            # Seleccionar parámetros
+            self._select_parameters()
+
+            # Botón siguiente (OK)
+            logging.info("Pulsando botón 'OK' para continuar...")
+            next_button = wait.until(EC.element_to_be_clickable(self._next_button_loc))
+            self.checked_click(next_button)
+            self._wait_for_refresh(next_button)
+
+            #Extraer la tabla resultante
+            self._extract_table(self.config.table_xpath, self.config.pagination_next_xpath)
+
+            # Confirmar datos
+            try:
+                confirm_button = wait.until(
+                    EC.element_to_be_clickable(self._confirm_button_loc)
+                )
+                self.checked_click(confirm_button)
+            except Exception:
+                logging.info("No se encontró el último botón de confirmación, saltando paso...")
+
+            logging.info("Selección de datos completada.")
+        except Exception as e:
+            logging.error("Error en select_data.", exc_info=True)
+            raise
+
+    def _wait_for_refresh(self, ref_element, timeout: int = 2):
+        """
+        Espera a que 'ref_element' quede obsoleto (stale) tras una acción que
+        refresca la página. Si la página no llega a refrescarse dentro del
+        tiempo indicado, se continúa sin error: reemplaza los sleeps fijos.
+        """
+        try:
+            with self._no_implicit():
+                WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                    EC.staleness_of(ref_element)
+                )
+        except TimeoutException:
+            pass
+
+    def _build_label_index(self) -> int:
+        """
+        (Re)construye en el navegador el índice texto -> label usado por
+        _batch_select, de modo que los recorridos del DOM no se repitan
+        entre la selección de elementos y la de parámetros.
+        Devuelve el número de labels indexados (0 si falla).
+        """
+        try:
+            return self.driver.execute_script(
+                "window.__qaLabels = new Map();"
+                " document.querySelectorAll('#quick-analysis label span').forEach(s => {"
+                "     window.__qaLabels.set(s.textContent.trim(), s.parentElement);"
+                " });"
+                " return window.__qaLabels.size;"
+            ) or 0
+        except WebDriverException:
+            return 0
+
+    def _batch_select(self, names: list[str], xpath_map: dict, kind: str):
+        """
+        Marca los checkboxes de 'names' en una sola llamada execute_script,
+        en lugar de un click de Selenium por cada uno (un round-trip HTTP al
+        driver por checkbox). Los nombres sin XPATH en el diccionario o que
+        no se encuentren en la página se registran como warning.
+        """
+        pairs = []
+        get_xpath = xpath_map.get
+        for name in names:
+            xpath = get_xpath(name)
+            if not xpath:
+                logging.warning(f"No se encontró el XPATH para el {kind} '{name}'.")
+                continue
+            pairs.append([name, xpath])
+        if not pairs:
+            return
+        missing = self.driver.execute_script(self._BATCH_SELECT_JS, pairs)
+        for name in missing or []:
+            logging.warning(f"No se encontró en la página el {kind} '{name}'.")
+
+    def _select_elements(self):
+        """
+        Marca los checkboxes correspondientes a los 'elements' configurados,
+        usando el diccionario 'Typology' para resolver el XPATH.
+        """
+        if not self.elements:
+            return
+        self._batch_select(self.elements, self._elements_xpaths, 'elemento')
+
+    def _select_parameters(self):
+        """
+        Marca los checkboxes correspondientes a los 'parameters' configurados,
+        usando el diccionario 'Typology' para resolver el XPATH.
+        """
+        if not self.parameters:
+            return
+        self._batch_select(self.parameters, self._parameters_xpaths, 'parámetro')
+
+    @staticmethod
+    def _clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Limpieza vectorizada de la tabla extraída: strip a las columnas de
+        texto y conversión a numérico de las columnas donde todos los
+        valores lo permiten. Una pasada de pandas por columna en lugar de
+        procesar celda a celda en Python. Se asume formato español (coma
+        decimal, punto de miles), la misma convención que se pasa a
+        read_html en _extract_table.
+        """
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            stripped = df[col].str.strip()
+            numeric = pd.to_numeric(
+                stripped.str.replace('.', '', regex=False)
+                        .str.replace(',', '.', regex=False),
+                errors='coerce'
+            )
+            # Solo se convierte si la columna completa es numérica
+            df[col] = numeric if numeric.notna().all() else stripped
+        return df
+
+    def _extract_table(self, table_xpath: str, pagination_next_xpath: str):
+        """
+        Extrae la tabla paginada y la guarda en CSV.
+        Cada página se parsea con pandas.read_html a partir del outerHTML
+        de la tabla (una sola llamada al driver por página). El parseo se
+        hace en hilos para solaparlo con la navegación a la página siguiente;
+        el orden de las páginas se conserva por la lista de futures.
+        Este método se puede separar en otra clase si lo deseas.
+        """
+        # Los argumentos estuvieron intercambiados en una versión anterior;
+        # esta comprobación ataja el error antes de llegar a Selenium.
+        assert table_xpath.startswith('/'), (
+            f"table_xpath no parece un XPATH: '{table_xpath}'"
+        )
+
+        logging.info("Iniciando extracción de tabla...")
+        pending = []
+        table_loc = (By.XPATH, table_xpath)
+
+        # Localizar la tabla una sola vez; solo se re-localiza tras un
+        # cambio de página confirmado (staleness del tbody anterior).
+        with self._no_implicit():
+            table_element = self._wait.until(EC.presence_of_element_located(table_loc))
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            while True:
+                # Tomar el HTML completo de la tabla en una sola llamada y
+                # parsearlo con pandas en segundo plano mientras el driver
+                # pasa a la página siguiente.
+                html = self._table_outer_html(table_element, table_xpath)
+                # El sitio muestra números en formato español (coma decimal,
+                # punto de miles); el default de read_html (thousands=',')
+                # convertiría "1,5" en 15. _clean_dataframe usa la misma
+                # convención para las columnas que queden como texto.
+                pending.append(pool.submit(
+                    pd.read_html, io.StringIO(html), thousands='.', decimal=','
+                ))
+
+                # Intentar pulsar el botón de siguiente en la paginación
+                try:
+                    next_button = self.driver.find_element(By.XPATH, pagination_next_xpath)
+                    # Verificar si está inhabilitado o no. Asumiendo que se usa la clase "disabled" o similar
+                    if 'disabled' in next_button.get_attribute('class'):
+                        break  # No hay más páginas
+                    # Referencia al tbody actual para detectar el refresco
+                    old_tbody = table_element.find_element(By.TAG_NAME, 'tbody')
+                    self.checked_click(next_button)
+                    # Esperar al refresco real en lugar de un sleep fijo
+                    self._wait_for_refresh(old_tbody)
+                    with self._no_implicit():
+                        table_element = self._wait.until(
+                            EC.presence_of_element_located(table_loc)
+                        )
+                except Exception:
+                    # Si no existe el botón o no es clickable, se asume fin de paginación
+                    break
+
+        # Guardar según el formato configurado
+        frames = [future.result()[0] for future in pending]
+        df = self._clean_dataframe(pd.concat(frames, ignore_index=True))
+        file_name = (f"Data_{self.typology_key}_{self.day}_{self.month}_{self.year}"
+                     f".{self.output_format}")
+        if self.output_format == "parquet":
+            df.to_parquet(file_name, index=False)
+        else:
+            df.to_csv(file_name, index=False)
+        logging.info(f"Tabla extraída y guardada en: {file_name}")
+        return file_name
+
+    def checked_click(self, element):
+        """
+        Hace click en un checkbox o botón solo si no está ya seleccionado.
+        La comprobación y el click se hacen en una sola llamada JS: con
+        is_selected() + click() serían dos round-trips al driver.
+        """
+        try:
+            self.driver.execute_script(
+                "const e = arguments[0];"
+                " if (('checked' in e) ? !e.checked : true) { e.click(); }",
+                element
+            )
+        except Exception as e:
+            logging.error("Error al hacer click en el elemento.", exc_info=True)
+            raise
+
+
+_QA_LABEL_TEMPLATE = '//*[@id="quick-analysis"]//span[contains(text(),"{}")]/parent::label'
+
+
+class _XPathDict(dict):
+    """
+    Diccionario que construye el XPATH de cada label bajo demanda a partir
+    de su nombre, en lugar de materializar ~150 cadenas largas al importar
+    el módulo. 'names' son los nombres cuyo texto en pantalla coincide con
+    la clave; 'aliases' mapea claves cuyo texto en pantalla difiere; y
+    'extras' contiene entradas con XPATH literal que no siguen la plantilla.
+    """
+
+    def __init__(self, names=(), aliases=None, extras=None):
+        super().__init__(extras or {})
+        self._names = frozenset(names)
+        self._aliases = aliases or {}
+
+    def __missing__(self, key):
+        if key in self._aliases:
+            xpath = _QA_LABEL_TEMPLATE.format(self._aliases[key])
+        elif key in self._names:
+            xpath = _QA_LABEL_TEMPLATE.format(key)
+        else:
+            raise KeyError(key)
+        self[key] = xpath
+        return xpath
+
+    def get(self, key, default=None):
+        # dict.get no pasa por __missing__, por eso se redefine aquí
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class Parameters:
+    _INV_NAMES = (
+        "CALIDAD COM",
+        "CORRIENTE AC FASE 1",
+        "CORRIENTE AC FASE 2",
+        "CORRIENTE AC FASE 3",
+        "CORRIENTE DC",
+        *(f"CORRIENTE DC IN {i:02d}" for i in range(1, 29)),
+        "DURACION ULTIMO MUESTREO",
+        "EFICIENCIA",
+        "ENERGIA ACTIVA",
+        "ENERGIA ACTIVA AÑO",
+        "ENERGIA ACTIVA DIA",
+        "ENERGIA ACTIVA MES",
+        "ESTADO COM",
+        "FACTOR DE POTENCIA",
+        "FECHA",
+        "FECHA ULTIMA LECTURA",
+        "FRECUENCIA",
+        "HUAWEI SMARTLOGGER AJUSTE ACTIVO",
+        "HUAWEI SMARTLOGGER CAPACIDAD NOMINAL PLANTA",
+        "HUAWEI SMARTLOGGER ESTADO COMUNICACIONES",
+        "HUAWEI SUN2000 ESTADO",
+        "HUAWEI SUN2000 TELEINDICACION",
+        "MARCA",
+        "MODELO",
+        "POTENCIA DC",
+        "POTENCIA NOMINAL",
+        "RESISTENCIA AISLAMIENTO",
+        "SETPOINT FACTOR DE POTENCIA",
+        "TEMPERATURA INT",
+        "TENSIÓN AC FASE 1-2",
+        "TENSIÓN AC FASE 1-N",
+        "TENSIÓN AC FASE 2-3",
+        "TENSIÓN AC FASE 2-N",
+        "TENSIÓN AC FASE 3-1",
+        "TENSIÓN AC FASE 3-N",
+        *(f"TENSIÓN DC IN {i:02d}" for i in range(1, 29)),
+    )
+    _METEO_NAMES = (
+        "PYRANOMETER 1 IRRADIANCE",
+        "PYRANOMETER 2 IRRADIANCE",
+        "PYRANOMETER 3 IRRADIANCE",
+        "RELATIVE HUMIDITY",
+        "AIR PRESSURE",
+        "AMBIENT TEMPERATURE",
+        "WIND DIRECTION ACTUAL",
+        "PYRANOMETER 1 TEMPERATURE",
+        "PYRANOMETER 2 TEMPERATURE",
+        "PYRANOMETER 3 TEMPERATURE",
+    )
+
+    Parameters_inv = _XPathDict(
+        names=_INV_NAMES,
+        extras={
+            # El span de POTENCIA ACTIVA lleva el texto con relleno de
+            # espacios, por lo que requiere una comparación exacta.
+            "POTENCIA ACTIVA": '//*[@id="quick-analysis"]//span[text()="                                POTENCIA ACTIVA                            "]/parent::label',
+        },
+    )
+    Parameters_meteo = _XPathDict(names=_METEO_NAMES)
+
+
+class Elements:
+    _ELEMENT_NAMES = (
+        *(f"UP1 INV1.1-{i:02d}" for i in range(1, 19)),
+        "UP2 INV1.2-01",
+    )
+    # Claves cuyo texto en pantalla difiere del nombre usado en el código
+    _ELEMENT_ALIASES = {
+        f"Universidad de Panama {planta}": f"Universidad Panamá {planta}"
+        for planta in ("1.1", "1.2", "2.1", "2.2", "3.1", "3.2", "4.1", "4.2")
+    }
+
+    Elements = _XPathDict(names=_ELEMENT_NAMES, aliases=_ELEMENT_ALIASES)
+
+
+class Typology:
+    Typology = {
+        "Inversor - (INVERSOR)": {
+            "Elements": Elements.Elements, # Elementos a seleccionar
+            "Parameters": Parameters.Parameters_inv,  # Parámetros generales
+        },
+        "Estación Meteorológica - (METEO)":{
+            "Elements": Elements.Elements, # Elementos a seleccionar
+            "Parameters": Parameters.Parameters_meteo,  # Parámetros generales
+
+        }
+
+    }
@@ -1,180 +1,357 @@
-import os
-import time
-import logging
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-
-from Utilities import FileManagerUtil
-
-
-class DownloadConfig:
-    """
-    Clase que contiene la configuración para el proceso de descarga.
-    """
-    def __init__(
-        self,
-        table_check_xpath: str,
-        download_button_xpath: str,
-        default_filename: str = "QuickAnalysis.xlsx",
-        renamed_filename_pattern: str = "QuickAnalysis_{day}_{month}_{year}.xlsx",
-        download_directory: str = None,
-        wait_time: int = 30,
-        max_download_wait: int = 60
-    ):
-        """
-        Parámetros:
-        -----------
-        table_check_xpath : str
-            XPATH de un elemento que indica que la tabla está presente y lista
-            (por ejemplo, un botón o columna).
-        download_button_xpath : str
-            XPATH del botón para iniciar la descarga.
-        default_filename : str
-            Nombre de archivo por defecto que se descarga (antes de renombrar).
-        renamed_filename_pattern : str
-            Patrón para renombrar el archivo una vez descargado.
-            Puede incluir {day}, {month}, {year} que se reemplazan dinámicamente.
-        download_directory : str
-            Directorio donde se guardan las descargas. Si es None,
-            se asume la carpeta de descargas del usuario.
-        wait_time : int
-            Tiempo de espera por defecto para `WebDriverWait` en esta clase.
-        max_download_wait : int
-            Tiempo máximo (segundos) para esperar a que el archivo aparezca tras pulsar descargar.
-        """
-        self.table_check_xpath = table_check_xpath
-        self.download_button_xpath = download_button_xpath
-        self.default_filename = default_filename
-        self.renamed_filename_pattern = renamed_filename_pattern
-        self.download_directory = download_directory
-        self.wait_time = wait_time
-        self.max_download_wait = max_download_wait
-
-
-class DownloadService:
-    """
-    Servicio para gestionar la descarga de datos desde una página web:
-    1. Esperar a que la tabla o botón de descarga esté listo.
-    2. Pulsar el botón de descarga.
-    3. Esperar a que el archivo aparezca en disco.
-    4. Renombrar el archivo usando un patrón configurable.
-    """
-
-    def __init__(self, driver, config: DownloadConfig):
-        """
-        Parámetros:
-        -----------
-        driver : WebDriver
-            Instancia de Selenium WebDriver inicializada.
-        config : DownloadConfig
-            Configuración de descargas (XPaths, nombre de archivo, etc.).
-        """
-        self.driver = driver
-        self.config = config
-
-    def download_data(self, day: str = None, month: str = None, year: str = None):
-        """
-        Ejecuta el proceso de descarga y renombrado.
-        Parámetros:
-        -----------
-        day : str | None
-            Día para el nombre del archivo renombrado. Si None, se toma el actual.
-        month : str | None
-            Mes para el nombre del archivo renombrado. Si None, se toma el actual.
-        year : str | None
-            Año para el nombre del archivo renombrado. Si None, se toma el actual.
-        """
-        try:
-            logging.info("Iniciando descarga de datos...")
-
-            wait = WebDriverWait(self.driver, self.config.wait_time)
-
-            # Asegurarnos de que la tabla o el botón de descarga se haya cargado:
-            wait.until(EC.presence_of_element_located((By.XPATH, self.config.table_check_xpath)))
-
-            # Pulsar el botón de descarga
-            download_button = wait.until(
-                EC.element_to_be_clickable((By.XPATH, self.config.download_button_xpath))
-            )
-            self.checked_click(download_button)
-            logging.info("Botón de descarga pulsado. Esperando aparición del archivo en disco...")
-
-            # Esperar a que el archivo aparezca en la carpeta de descargas
-            downloaded_file = self._wait_for_downloaded_file(
-                filename=self.config.default_filename,
-                timeout=self.config.max_download_wait
-            )
-            if not downloaded_file:
-                raise FileNotFoundError(f"No se encontró el archivo '{self.config.default_filename}' "
-                                        f"en el tiempo máximo de {self.config.max_download_wait}s.")
-
-            # Renombrar el archivo descargado
-            final_name = self._generate_filename(day, month, year)
-            FileManagerUtil.rename_file(downloaded_file, final_name, self.config.download_directory)
-
-            logging.info(f"Descarga y renombrado completado. Archivo final: {final_name}")
-        except Exception as e:
-            logging.error("Error en download_data.", exc_info=True)
-            raise
-
-    def checked_click(self, element):
-        """
-        Hace click en el elemento si no está seleccionado o si no es un checkbox.
-        """
-        try:
-            # Para checkboxes: sólo hace click si no está seleccionado.
-            if hasattr(element, 'is_selected') and element.is_selected():
-                return
-            element.click()
-        except Exception as e:
-            logging.error("Error al hacer click en el elemento de descarga.", exc_info=True)
-            raise
-
-    def _wait_for_downloaded_file(self, filename: str, timeout: int) -> str:
-        """
-        Espera hasta que aparezca un archivo con el nombre `filename` en el
-        directorio de descargas. Retorna la ruta completa del archivo si se
-        encuentra dentro del tiempo límite, o None si no aparece.
-        """
-        download_dir = self.config.download_directory
-        if not download_dir:
-            # Tomar carpeta de descargas por defecto del usuario
-            download_dir = os.path.join(os.path.expanduser('~'), 'Downloads')
-
-        full_path = os.path.join(download_dir, filename)
-
-        elapsed = 0
-        interval = 1  # segundos
-        while elapsed < timeout:
-            if os.path.exists(full_path):
-                # Verificamos si el archivo está siendo escrito (opcional)
-                # Para ello, podemos intentar abrirlo en modo append.
-                try:
-                    with open(full_path, 'ab'):
-                        pass
-                    return full_path
-                except PermissionError:
-                    # Archivo aún en proceso de descarga
-                    time.sleep(interval)
-                    elapsed += interval
-            else:
-                time.sleep(interval)
-                elapsed += interval
-
-        return None  # No se encontró en el tiempo limite
-
-    def _generate_filename(self, day: str, month: str, year: str) -> str:
-        """
-        Genera el nombre final del archivo usando el patrón en config. Si
-        day/month/year no se pasan, se usan valores actuales de time.strftime().
-        """
-        day = day or time.strftime("%d")
-        month = month or time.strftime("%B")
-        year = year or time.strftime("%Y")
-
-        # Reemplazar placeholders en el patrón
-        final_name = self.config.renamed_filename_pattern.format(
-            day=day, month=month, year=year
-        )
-        return final_name
+import os
+import time
+import logging
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException
+)
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+
+# inotify solo está disponible en Linux; en otros SO se usa el polling clásico
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+    inotify_flags = None
+
+from Utilities import FileManagerUtil, _DEFAULT_DOWNLOAD_DIR
+
+
+class DownloadConfig:
+    """
+    Clase que contiene la configuración para el proceso de descarga.
+    """
+    def __init__(
+        self,
+        table_check_xpath: str,
+        download_button_xpath: str,
+        default_filename: str = "QuickAnalysis.xlsx",
+        renamed_filename_pattern: str = "QuickAnalysis_{day}_{month}_{year}.xlsx",
+        download_directory: str = None,
+        wait_time: int = 30,
+        max_download_wait: int = 60
+    ):
+        """
+        Parámetros:
+        -----------
+        table_check_xpath : str
+            XPATH de un elemento que indica que la tabla está presente y lista
+            (por ejemplo, un botón o columna).
+        download_button_xpath : str
+            XPATH del botón para iniciar la descarga.
+        default_filename : str
+            Nombre de archivo por defecto que se descarga (antes de renombrar).
+        renamed_filename_pattern : str
+            Patrón para renombrar el archivo una vez descargado.
+            Puede incluir {day}, {month}, {year} que se reemplazan dinámicamente.
+        download_directory : str
+            Directorio donde se guardan las descargas. Si es None,
+            se asume la carpeta de descargas del usuario.
+        wait_time : int
+            Tiempo de espera por defecto para `WebDriverWait` en esta clase.
+        max_download_wait : int
+            Tiempo máximo (segundos) para esperar a que el archivo aparezca tras pulsar descargar.
+        """
+        self.table_check_xpath = table_check_xpath
+        self.download_button_xpath = download_button_xpath
+        self.default_filename = default_filename
+        self.renamed_filename_pattern = renamed_filename_pattern
+        self.download_directory = download_directory
+        self.wait_time = wait_time
+        self.max_download_wait = max_download_wait
+
+
+class DownloadService:
+    """
+    Servicio para gestionar la descarga de datos desde una página web:
+    1. Esperar a que la tabla o botón de descarga esté listo.
+    2. Pulsar el botón de descarga.
+    3. Esperar a que el archivo aparezca en disco.
+    4. Renombrar el archivo usando un patrón configurable.
+    """
+
+    # Secuencia de clicks fusionada en una sola llamada asíncrona: cada
+    # par wait.until + click desde Python cuesta 2-3 round-trips al
+    # driver. Aquí el navegador espera con un MutationObserver a que cada
+    # elemento exista y esté habilitado, lo pulsa y pasa al siguiente.
+    # Acepta selectores CSS, o XPATH si empiezan por '/'.
+    _FUSED_CLICK_JS = """
+        const sels = arguments[0];
+        const timeoutMs = arguments[1];
+        const cb = arguments[arguments.length - 1];
+        const find = (sel) => sel.startsWith('/')
+            ? document.evaluate(sel, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : document.querySelector(sel);
+        const timer = setTimeout(() => cb('timeout'), timeoutMs);
+        const step = (i) => {
+            if (i === sels.length) { clearTimeout(timer); return cb(null); }
+            const el = find(sels[i]);
+            if (el && !el.disabled) { el.click(); return step(i + 1); }
+            const mo = new MutationObserver(() => {
+                const e = find(sels[i]);
+                if (e && !e.disabled) {
+                    mo.disconnect();
+                    e.click();
+                    step(i + 1);
+                }
+            });
+            mo.observe(document.body,
+                       {subtree: true, childList: true, attributes: true});
+        };
+        step(0);
+    """
+
+    def __init__(self, driver, config: DownloadConfig):
+        """
+        Parámetros:
+        -----------
+        driver : WebDriver
+            Instancia de Selenium WebDriver inicializada.
+        config : DownloadConfig
+            Configuración de descargas (XPaths, nombre de archivo, etc.).
+        """
+        self.driver = driver
+        self.config = config
+        # Locators y espera construidos una sola vez y reutilizados en cada
+        # download_data, en lugar de recrearlos por llamada.
+        self._table_check_loc = (By.XPATH, config.table_check_xpath)
+        self._download_dir = config.download_directory or _DEFAULT_DOWNLOAD_DIR
+        self._download_button_loc = (By.XPATH, config.download_button_xpath)
+        # Sondeo a 50 ms (el default de 500 ms añade ~250 ms de latencia
+        # mediana por paso) e ignorando referencias stale transitorias.
+        self._wait = WebDriverWait(
+            driver, config.wait_time, poll_frequency=0.05,
+            ignored_exceptions=(StaleElementReferenceException,)
+        )
+        self._configure_cdp_download()
+
+    def _configure_cdp_download(self):
+        """
+        Fija vía CDP (Browser.setDownloadBehavior) el directorio de descargas
+        del navegador al configurado, de modo que el archivo aterrice donde
+        este servicio lo espera en lugar de suponer ~/Downloads. Solo aplica
+        en navegadores Chromium; en el resto se ignora sin error.
+        """
+        try:
+            self.driver.execute_cdp_cmd(
+                "Browser.setDownloadBehavior",
+                {
+                    "behavior": "allow",
+                    "downloadPath": self._download_dir,
+                    "eventsEnabled": True
+                }
+            )
+        except Exception:
+            logging.info("Driver sin soporte CDP; se mantiene el directorio de descargas del navegador.")
+
+    def download_data(self, day: str = None, month: str = None, year: str = None):
+        """
+        Ejecuta el proceso de descarga y renombrado.
+        Parámetros:
+        -----------
+        day : str | None
+            Día para el nombre del archivo renombrado. Si None, se toma el actual.
+        month : str | None
+            Mes para el nombre del archivo renombrado. Si None, se toma el actual.
+        year : str | None
+            Año para el nombre del archivo renombrado. Si None, se toma el actual.
+        """
+        try:
+            logging.info("Iniciando descarga de datos...")
+
+            wait = self._wait
+
+            # Asegurarnos de que la tabla o el botón de descarga se haya cargado:
+            wait.until(EC.presence_of_element_located(self._table_check_loc))
+
+            # Pulsar el botón de descarga. El watch de inotify se registra
+            # ANTES del click para no perder el evento si el archivo aparece
+            # de inmediato.
+            download_button = wait.until(
+                EC.element_to_be_clickable(self._download_button_loc)
+            )
+            watcher = self._register_download_watch()
+            self.checked_click(download_button)
+            logging.info("Botón de descarga pulsado. Esperando aparición del archivo en disco...")
+
+            # Esperar a que el archivo aparezca en la carpeta de descargas
+            downloaded_file = self._wait_for_downloaded_file(
+                filename=self.config.default_filename,
+                timeout=self.config.max_download_wait,
+                watcher=watcher
+            )
+            if not downloaded_file:
+                raise FileNotFoundError(f"No se encontró el archivo '{self.config.default_filename}' "
+                                        f"en el tiempo máximo de {self.config.max_download_wait}s.")
+
+            # Renombrar el archivo descargado
+            final_name = self._generate_filename(day, month, year)
+            FileManagerUtil.rename_file(downloaded_file, final_name, self._download_dir)
+
+            logging.info(f"Descarga y renombrado completado. Archivo final: {final_name}")
+        except Exception as e:
+            logging.error("Error en download_data.", exc_info=True)
+            raise
+
+    def checked_click(self, element):
+        """
+        Hace click en el elemento si no está seleccionado o si no es un checkbox.
+        La comprobación y el click van en una sola llamada JS: is_selected()
+        más click() son dos round-trips al driver, y el click nativo además
+        falla con "element not interactable" si hay un overlay encima.
+        """
+        try:
+            self.driver.execute_script(
+                "var e=arguments[0];"
+                "if(e.tagName==='INPUT'&&e.type==='checkbox'){"
+                " if(!e.checked) e.click();"
+                "} else { e.click(); }",
+                element
+            )
+        except Exception as e:
+            logging.error("Error al hacer click en el elemento de descarga.", exc_info=True)
+            raise
+
+    @staticmethod
+    def fused_click_sequence(driver, selectors, timeout_ms: int = 30000):
+        """
+        Pulsa en orden los selectores dados (CSS, o XPATH si empiezan por
+        '/') en una sola llamada JS asíncrona. Lanza TimeoutException si
+        la secuencia no se completa dentro de timeout_ms. Es estático para
+        poder usarse sin instanciar el servicio (p.ej. desde main).
+        """
+        try:
+            # El timeout de script es estado de la sesión: se restaura al
+            # salir para no alargar los execute_async_script posteriores.
+            prev_timeout = driver.timeouts.script
+            driver.set_script_timeout(timeout_ms / 1000 + 5)
+            try:
+                error = driver.execute_async_script(
+                    DownloadService._FUSED_CLICK_JS, list(selectors), timeout_ms
+                )
+            finally:
+                driver.set_script_timeout(prev_timeout)
+            if error:
+                raise TimeoutException(
+                    f"fused_click_sequence: '{error}' con selectores {selectors}"
+                )
+        except Exception as e:
+            logging.error("Error en la secuencia de clicks fusionada.", exc_info=True)
+            raise
+
+    def _register_download_watch(self):
+        """
+        Registra un watch de inotify sobre el directorio de descargas.
+        Retorna el objeto INotify, o None si no hay soporte (SO distinto de
+        Linux o librería no instalada); en ese caso se usa el polling clásico.
+        """
+        if INotify is None:
+            return None
+        try:
+            inotify = INotify()
+            inotify.add_watch(
+                self._download_dir,
+                inotify_flags.CREATE | inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+            )
+            return inotify
+        except OSError:
+            logging.info("No se pudo registrar el watch de inotify; se usará polling.")
+            return None
+
+    def _wait_for_downloaded_file(self, filename: str, timeout: int, watcher=None) -> str:
+        """
+        Espera hasta que aparezca un archivo con el nombre `filename` en el
+        directorio de descargas. Retorna la ruta completa del archivo si se
+        encuentra dentro del tiempo límite, o None si no aparece.
+
+        Si `watcher` (INotify) está disponible, se bloquea en los eventos del
+        kernel (CLOSE_WRITE/MOVED_TO garantizan que el escritor terminó) en
+        lugar de sondear el disco cada segundo.
+        """
+        full_path = os.path.join(self._download_dir, filename)
+
+        if watcher is not None:
+            try:
+                return self._wait_with_inotify(watcher, filename, full_path, timeout)
+            finally:
+                watcher.close()
+
+        # Backoff exponencial: 10 ms -> 20 -> 40 -> ... -> 500 ms. Las
+        # descargas que terminan en milisegundos se detectan casi al
+        # instante y las largas no pagan más de dos sondeos por segundo.
+        deadline = time.monotonic() + timeout
+        interval = 0.01
+        while time.monotonic() < deadline:
+            if self._is_download_complete(full_path):
+                return full_path
+            time.sleep(interval)
+            interval = min(interval * 2, 0.5)
+
+        return None  # No se encontró en el tiempo limite
+
+    @staticmethod
+    def _is_download_complete(full_path: str) -> bool:
+        """
+        Indica si el archivo existe y su descarga terminó. Chrome escribe a
+        '<nombre>.crdownload' y Firefox a '<nombre>.part' hasta completar, así
+        que basta comprobar la ausencia del centinela (os.path.exists) en vez
+        de abrir el archivo en modo append como sonda. El open se conserva
+        solo como último recurso para navegadores desconocidos.
+        """
+        if not os.path.exists(full_path):
+            return False
+        if (os.path.exists(full_path + '.crdownload')
+                or os.path.exists(full_path + '.part')):
+            return False
+        try:
+            with open(full_path, 'ab'):
+                pass
+            return True
+        except PermissionError:
+            # Archivo aún en proceso de descarga
+            return False
+
+    @staticmethod
+    def _wait_with_inotify(watcher, filename: str, full_path: str, timeout: int) -> str:
+        """
+        Bloquea en los eventos de inotify hasta que el archivo `filename`
+        termine de escribirse (CLOSE_WRITE) o aparezca por rename (MOVED_TO),
+        o hasta agotar `timeout` segundos. Retorna la ruta o None.
+
+        Cada coincidencia se valida con _is_download_complete: Firefox crea
+        y cierra un placeholder vacío con el nombre final mientras escribe
+        a '<nombre>.part', así que un CLOSE_WRITE sobre el nombre final no
+        garantiza que la descarga haya terminado.
+        """
+        # Por si el archivo ya estaba completo antes de registrar el watch
+        if DownloadService._is_download_complete(full_path):
+            return full_path
+
+        done_mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            for event in watcher.read(timeout=int(remaining * 1000)):
+                if (event.name == filename and event.mask & done_mask
+                        and DownloadService._is_download_complete(full_path)):
+                    return full_path
+
+    def _generate_filename(self, day: str, month: str, year: str) -> str:
+        """
+        Genera el nombre final del archivo usando el patrón en config. Si
+        day/month/year no se pasan, se usan valores actuales de time.strftime().
+        """
+        day = day or time.strftime("%d")
+        month = month or time.strftime("%B")
+        year = year or time.strftime("%Y")
+
+        # Reemplazar placeholders en el patrón
+        final_name = self.config.renamed_filename_pattern.format(
+            day=day, month=month, year=year
+        )
+        return final_name
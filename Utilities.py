@@ -1,153 +1,241 @@
-import logging
-import os
-import re
-import time
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-
-
-class DatePickerUtil:
-    """
-    Utilidad para seleccionar fechas en un datepicker genérico.
-    Se asume que el datepicker se abre haciendo click en un input,
-    y que posteriormente se interactúa con sus controles (mes, año, días).
-    """
-    @staticmethod
-    def select_date(driver, day: int, month: str, year: int, wait_time: int = 10,
-                    input_datapicker_xpath:str = '//input[@class="form-control form-control-sm"]',
-                    datepicker_container_class_name: str = 'datepicker-dropdown',
-                    datepicker_switch_xpath: str = '//th[@class="datepicker-switch"]',
-                    prev_button_xpath: str = '//th[@class="prev"]'
-                    ):
-        """
-        Selecciona la fecha dada (day-month-year) en un datepicker.
-        Parámetros:
-        -----------
-        driver : WebDriver
-            Instancia de Selenium WebDriver.
-        day : int
-            Día a seleccionar (1-31).
-        month : str
-            Nombre del mes en minúsculas o tal como se muestre en el datepicker. p.ej. "febrero"
-        year : int
-            Año a seleccionar. p.ej. 2025
-        wait_time : int
-            Tiempo máximo de espera para encontrar elementos del datepicker.
-        datepicker_container_xpath : str
-            XPATH que identifica el contenedor del datepicker. Ajustar según tu HTML.
-        datepicker_switch_xpath : str
-            XPATH que localiza el elemento “switch” (en muchos datepickers, es el que muestra “March 2025”).
-        prev_button_xpath : str
-            XPATH del botón de retroceso de mes o año.
-
-        Importante:
-        Esta lógica asume un datepicker de estilo “bootstrap datepicker”, donde
-        cambiar de mes puede requerir pulsar flechas (prev/next). Ajustar según tu caso.
-        """
-        logger = logging.getLogger(__name__)
-
-        try:
-            logger.info(f"Seleccionando fecha: {day}-{month}-{year}")
-            wait = WebDriverWait(driver, wait_time)
-            wait.until(EC.visibility_of_element_located((By.XPATH, input_datapicker_xpath))).click()
-            # Esperar a que el contenedor del datepicker sea visible
-            wait.until(EC.visibility_of_element_located((By.CLASS_NAME, datepicker_container_class_name)))
-
-            # Asegurarnos de que podamos interactuar con el switch (que muestra mes y año)
-            datepicker_switch = wait.until(EC.visibility_of_element_located((By.XPATH, datepicker_switch_xpath)))
-            current_text = datepicker_switch.text.lower()  # Ejemplo: "March 2025"
-
-            # Si necesitamos cambiar de año, abrimos vista de años (esto depende del datepicker).
-            # A veces hay un segundo click en el switch para ver años, etc. Se ajusta según tu caso.
-            # Este es un ejemplo muy simplificado que intenta chequear si el año difiere:
-            current_year_match = re.search(r'(\d{4})', current_text)
-            if current_year_match:
-                current_year = int(current_year_match.group(1))
-            else:
-                # Si no hay match, se podría necesitar otro enfoque
-                current_year = year
-
-            # Moverse hacia atrás o adelante hasta encontrar el año deseado
-            # (En algunos datepickers, se requiere pulsar "switch" y luego un "prev/next").
-            # Aquí solo mostramos un ejemplo simplificado que navega mes a mes hacia atrás.
-            while current_year != year:
-                # Si el año actual es mayor que el deseado, pulsamos prev, de lo contrario next
-                # (No tenemos un next_button_xpath, se podría agregar también.)
-                if current_year > year:
-                    prev_button = driver.find_element(By.XPATH, prev_button_xpath)
-                    prev_button.click()
-                else:
-                    # Aquí agregamos un "next_button_xpath" según sea necesario
-                    # next_button = driver.find_element(By.XPATH, next_button_xpath)
-                    # next_button.click()
-                    # Ejemplo: forzamos un break si no hay next button
-                    raise NotImplementedError("Falta implementar el botón 'next' para avanzar años.")
-                time.sleep(0.5)
-                datepicker_switch = wait.until(EC.visibility_of_element_located((By.XPATH, datepicker_switch_xpath)))
-                current_text = datepicker_switch.text.lower()
-                # Actualizar current_year
-                match = re.search(r'(\d{4})', current_text)
-                if match:
-                    current_year = int(match.group(1))
-
-            # Una vez en el año correcto, movernos hasta el mes
-            # Ejemplo muy simplificado: si “month” no está en "current_text", pulsamos prev:
-            while month.lower() not in current_text:
-                prev_button = driver.find_element(By.XPATH, prev_button_xpath)
-                prev_button.click()
-                time.sleep(0.5)
-                datepicker_switch = wait.until(EC.visibility_of_element_located((By.XPATH, datepicker_switch_xpath)))
-                current_text = datepicker_switch.text.lower()
-
-            # Finalmente, seleccionamos el día
-            day_xpath = f'//td[@class="day" and text()="{day}"]'
-            day_element = wait.until(EC.element_to_be_clickable((By.XPATH, day_xpath)))
-            day_element.click()
-
-        except Exception as e:
-            logger.error("Error al seleccionar la fecha en el datepicker.", exc_info=True)
-            raise
-
-
-class FileManagerUtil:
-    """
-    Utilidad para operaciones de manejo de archivos: renombrar, mover, etc.
-    """
-
-    @staticmethod
-    def rename_file(old_name: str, new_name: str, directory: str = None):
-        """
-        Renombra un archivo en 'directory' (o en la carpeta de Descargas del usuario, si directory es None).
-        Parámetros:
-        -----------
-        old_name : str
-            Nombre o ruta actual del archivo.
-        new_name : str
-            Nuevo nombre (sin ruta) o ruta completa al que se desea renombrar el archivo.
-        directory : str | None
-            Directorio donde se encuentra el archivo y donde se renombrará. Si es None,
-            se usa la carpeta de Descargas del usuario.
-        """
-        logger = logging.getLogger(__name__)
-        try:
-            if directory is None:
-                directory = os.path.join(os.path.expanduser('~'), 'Downloads')
-
-            old_file_path = os.path.join(directory, old_name)
-            # Si new_name es solo el nombre, se renombra en el mismo directorio
-            # Si quisieras permitir new_name con ruta absoluta, podrías validarlo.
-            new_file_path = (new_name if os.path.isabs(new_name)
-                             else os.path.join(directory, new_name))
-
-            logger.info(f"Renombrando archivo: {old_file_path} -> {new_file_path}")
-            os.rename(old_file_path, new_file_path)
-        except FileNotFoundError:
-            logger.error(f"Error: Archivo '{old_file_path}' no encontrado.", exc_info=True)
-            raise
-        except FileExistsError:
-            logger.error(f"Error: El archivo '{new_file_path}' ya existe.", exc_info=True)
-            raise
-        except Exception as e:
-            logger.error("Error inesperado al renombrar archivo.", exc_info=True)
-            raise
+import logging
+import os
+import re
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+
+# Compilada una vez a nivel de módulo; re.search re-consulta la caché de
+# patrones (lookup + lock) en cada iteración del bucle de navegación.
+_YEAR_RE = re.compile(r"(\d{4})")
+
+# Carpeta de descargas por defecto, resuelta una sola vez al importar:
+# os.path.expanduser implica lookup de entorno/passwd en cada llamada.
+_DEFAULT_DOWNLOAD_DIR = os.path.join(os.path.expanduser('~'), 'Downloads')
+
+
+class DatePickerUtil:
+    """
+    Utilidad para seleccionar fechas en un datepicker genérico.
+    Se asume que el datepicker se abre haciendo click en un input,
+    y que posteriormente se interactúa con sus controles (mes, año, días).
+    """
+
+    # Navegación completa (año -> mes -> día) en una sola llamada JS: el
+    # recorrido con Selenium cuesta un round-trip HTTP al driver por cada
+    # click de 'prev' más los sleeps de sincronización. El datepicker de
+    # bootstrap actualiza el DOM de forma síncrona, así que el bucle JS no
+    # necesita esperas. Devuelve 'ok' o un motivo para usar el respaldo.
+    _PICK_DATE_JS = """
+        const [dia, mes, anio, maxPasos] = arguments;
+        const sw = () => document.querySelector('th.datepicker-switch');
+        const prev = () => document.querySelector('th.prev');
+        if (!sw() || !prev()) { return 'sin-datepicker'; }
+        const texto = () => sw().textContent.trim().toLowerCase();
+        const anioDe = t => { const m = t.match(/\\d{4}/); return m ? +m[0] : null; };
+        let pasos = 0;
+        while (anioDe(texto()) !== null && anioDe(texto()) > anio) {
+            prev().click();
+            if (++pasos > maxPasos) { return 'limite'; }
+        }
+        const a = anioDe(texto());
+        if (a !== null && a < anio) { return 'sin-boton-next'; }
+        while (!texto().includes(mes)) {
+            prev().click();
+            if (++pasos > maxPasos) { return 'limite'; }
+        }
+        for (const td of document.querySelectorAll('td.day')) {
+            if (td.className === 'day' && td.textContent.trim() === String(dia)) {
+                td.click();
+                return 'ok';
+            }
+        }
+        return 'sin-dia';
+    """
+
+    @staticmethod
+    def select_date(driver, day: int, month: str, year: int, wait_time: int = 10,
+                    input_datapicker_selector: str = 'input.form-control.form-control-sm',
+                    datepicker_container_class_name: str = 'datepicker-dropdown',
+                    datepicker_switch_selector: str = 'th.datepicker-switch',
+                    prev_button_selector: str = 'th.prev'
+                    ):
+        """
+        Selecciona la fecha dada (day-month-year) en un datepicker.
+        Parámetros:
+        -----------
+        driver : WebDriver
+            Instancia de Selenium WebDriver.
+        day : int
+            Día a seleccionar (1-31).
+        month : str
+            Nombre del mes en minúsculas o tal como se muestre en el datepicker. p.ej. "febrero"
+        year : int
+            Año a seleccionar. p.ej. 2025
+        wait_time : int
+            Tiempo máximo de espera para encontrar elementos del datepicker.
+        input_datapicker_selector : str
+            Selector CSS del input que abre el datepicker. Ajustar según tu HTML.
+        datepicker_container_class_name : str
+            Clase que identifica el contenedor del datepicker.
+        datepicker_switch_selector : str
+            Selector CSS del elemento “switch” (en muchos datepickers, es el que muestra “March 2025”).
+        prev_button_selector : str
+            Selector CSS del botón de retroceso de mes o año.
+
+        Los localizadores usan CSS (querySelector nativo del navegador) en
+        lugar de XPATH por atributo de clase, bastante más rápido por sondeo.
+
+        Importante:
+        Esta lógica asume un datepicker de estilo “bootstrap datepicker”, donde
+        cambiar de mes puede requerir pulsar flechas (prev/next). Ajustar según tu caso.
+        """
+        logger = logging.getLogger(__name__)
+
+        try:
+            logger.info(f"Seleccionando fecha: {day}-{month}-{year}")
+            month_lc = month.lower()
+            # Sondeo a 50 ms: los elementos del datepicker suelen aparecer
+            # en <100 ms y el default de 500 ms penaliza cada paso.
+            wait = WebDriverWait(
+                driver, wait_time, poll_frequency=0.05,
+                ignored_exceptions=(StaleElementReferenceException,)
+            )
+            wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, input_datapicker_selector))).click()
+            # Esperar a que el contenedor del datepicker sea visible
+            wait.until(EC.visibility_of_element_located((By.CLASS_NAME, datepicker_container_class_name)))
+
+            # Intentar la navegación completa en una sola llamada JS
+            try:
+                result = driver.execute_script(
+                    DatePickerUtil._PICK_DATE_JS, day, month_lc, year, 240
+                )
+            except Exception:
+                result = 'error-js'
+            if result == 'ok':
+                return
+            logger.info(f"Navegación JS del datepicker no disponible ({result}); "
+                        "usando el recorrido con Selenium.")
+
+            # Asegurarnos de que podamos interactuar con el switch (que muestra mes y año)
+            datepicker_switch = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, datepicker_switch_selector)))
+            current_text = datepicker_switch.text.lower()  # Ejemplo: "March 2025"
+
+            # Si necesitamos cambiar de año, abrimos vista de años (esto depende del datepicker).
+            # A veces hay un segundo click en el switch para ver años, etc. Se ajusta según tu caso.
+            # Este es un ejemplo muy simplificado que intenta chequear si el año difiere:
+            current_year_match = _YEAR_RE.search(current_text)
+            if current_year_match:
+                current_year = int(current_year_match.group(1))
+            else:
+                # Si no hay match, se podría necesitar otro enfoque
+                current_year = year
+
+            # Navegación directa: un click en el switch abre la vista de
+            # meses y otro la de años. Desde la vista de años cada click en
+            # prev/next salta una década completa, en lugar de un mes por
+            # click (cada uno un round-trip al driver más un sleep fijo).
+            datepicker_switch.click()
+
+            if current_year != year:
+                # Entrar a la vista de años/décadas
+                wait.until(EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, '.datepicker-months ' + datepicker_switch_selector)
+                )).click()
+
+                def _pick_year(drv):
+                    spans = drv.find_elements(By.CSS_SELECTOR, '.datepicker-years span.year')
+                    visible = [int(s.text) for s in spans if s.text.strip().isdigit()]
+                    if not visible:
+                        return False
+                    # Año fuera de la década mostrada: saltar de década en década
+                    if year < min(visible):
+                        drv.find_element(
+                            By.CSS_SELECTOR, '.datepicker-years ' + prev_button_selector
+                        ).click()
+                        return False
+                    if year > max(visible):
+                        drv.find_element(By.CSS_SELECTOR, '.datepicker-years th.next').click()
+                        return False
+                    for span in spans:
+                        if span.text.strip() == str(year):
+                            span.click()
+                            return True
+                    return False
+                wait.until(_pick_year)
+
+            # Vista de meses del año correcto: click directo en el mes
+            # (los spans muestran el nombre abreviado, p.ej. "feb").
+            def _pick_month(drv):
+                for span in drv.find_elements(By.CSS_SELECTOR, '.datepicker-months span.month'):
+                    abbrev = span.text.strip().lower()
+                    if abbrev and month_lc.startswith(abbrev):
+                        span.click()
+                        return True
+                return False
+            wait.until(_pick_month)
+
+            # Finalmente, seleccionamos el día. CSS no permite filtrar por
+            # texto, así que se listan los td.day y se filtra en Python
+            # (la comparación exacta de clase excluye los días del mes
+            # anterior/siguiente, que llevan "day old"/"day new").
+            def _click_day(drv):
+                for td in drv.find_elements(By.CSS_SELECTOR, 'td.day'):
+                    if td.get_attribute('class') == 'day' and td.text.strip() == str(day):
+                        td.click()
+                        return True
+                return False
+            wait.until(_click_day)
+
+        except Exception as e:
+            logger.error("Error al seleccionar la fecha en el datepicker.", exc_info=True)
+            raise
+
+
+class FileManagerUtil:
+    """
+    Utilidad para operaciones de manejo de archivos: renombrar, mover, etc.
+    """
+
+    @staticmethod
+    def rename_file(old_name: str, new_name: str, directory: str = None):
+        """
+        Renombra un archivo en 'directory' (o en la carpeta de Descargas del usuario, si directory es None).
+        Parámetros:
+        -----------
+        old_name : str
+            Nombre o ruta actual del archivo.
+        new_name : str
+            Nuevo nombre (sin ruta) o ruta completa al que se desea renombrar el archivo.
+        directory : str | None
+            Directorio donde se encuentra el archivo y donde se renombrará. Si es None,
+            se usa la carpeta de Descargas del usuario.
+
+        Si el destino ya existe se sobrescribe de forma atómica (os.replace):
+        el servicio se re-ejecuta a diario y el archivo del día reemplaza al
+        anterior de forma intencional.
+        """
+        logger = logging.getLogger(__name__)
+        try:
+            if directory is None:
+                directory = _DEFAULT_DOWNLOAD_DIR
+
+            old_file_path = os.path.join(directory, old_name)
+            # Si new_name es solo el nombre, se renombra en el mismo directorio
+            # Si quisieras permitir new_name con ruta absoluta, podrías validarlo.
+            new_file_path = (new_name if os.path.isabs(new_name)
+                             else os.path.join(directory, new_name))
+
+            logger.info(f"Renombrando archivo: {old_file_path} -> {new_file_path}")
+            if os.path.exists(new_file_path):
+                logger.info(f"El archivo '{new_file_path}' ya existe; se sobrescribe.")
+            # os.replace sobrescribe de forma atómica también en Windows,
+            # donde os.rename fallaría con FileExistsError.
+            os.replace(old_file_path, new_file_path)
+        except FileNotFoundError:
+            logger.error(f"Error: Archivo '{old_file_path}' no encontrado.", exc_info=True)
+            raise
+        except Exception as e:
+            logger.error("Error inesperado al renombrar archivo.", exc_info=True)
+            raise
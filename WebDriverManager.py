@@ -1,3 +1,4 @@
+import functools
 import logging
 import platform
 import os
@@ -8,17 +9,19 @@ from selenium.common.exceptions import (
     WebDriverException
 )
 
-# Para Edge
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.edge.options import Options as EdgeOptions
+# Los stacks de Edge/Chrome/Firefox se importan dentro de la rama de
+# _create_driver que los usa: cargar los tres al importar el módulo
+# cuesta ~200 ms de arranque y solo uno se usa por proceso.
 
-# Para Chrome/Chromium
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
 
-# Para Firefox
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
+@functools.lru_cache(maxsize=None)
+def _detect_jetson():
+    """
+    Indica si estamos en Jetson Nano (arquitectura aarch64). Cacheado a
+    nivel de módulo: la arquitectura no cambia durante el proceso y así
+    no se re-consulta por cada WebDriverManager creado.
+    """
+    return platform.machine() == "aarch64"
 
 
 class WebDriverManager:
@@ -35,23 +38,35 @@ class WebDriverManager:
         Define si el navegador se ejecutará en modo headless (sin interfaz).
     driver_path : str | None
         Ruta al driver específico, en caso de no usar el instalado por defecto.
+    user_data_dir : str | None
+        Directorio del perfil persistente de Chrome. Si es None se usa
+        ~/.cache/scraper-chrome. Un perfil caliente conserva caché
+        DNS/HTTP, cookies y JS compilado entre ejecuciones.
     driver : WebDriver | None
         Instancia del WebDriver.
     """
 
+    # Rutas de driver resueltas una sola vez por proceso: el probing con
+    # os.path.exists/os.access se repetiría en cada init_driver (workers
+    # paralelos, reintentos) si no se cachea.
+    _JETSON_CHROMEDRIVER = None
+    _JETSON_GECKODRIVER = None
+
     def __init__(
         self,
         browser: str = "edge",
         headless: bool = True,
-        driver_path: str = None
+        driver_path: str = None,
+        user_data_dir: str = None
     ):
         self.browser = browser.lower().strip()
         self.headless = headless
         self.driver_path = driver_path
+        self.user_data_dir = user_data_dir
         self.driver = None
 
         # Determinar si estamos en Jetson Nano (arquitectura aarch64)
-        self._is_jetson = (platform.machine() == "aarch64")
+        self._is_jetson = _detect_jetson()
 
     def init_driver(self):
         """
@@ -84,6 +99,8 @@ class WebDriverManager:
 
         # === Caso: Microsoft Edge ===
         if self.browser == "edge":
+            from selenium.webdriver.edge.options import Options as EdgeOptions
+
             if self._is_jetson:
                 # Edge en Jetson no está soportado oficialmente.
                 logging.warning("Edge no está soportado oficialmente en NVIDIA Jetson. "
@@ -107,12 +124,37 @@ class WebDriverManager:
 
         # === Caso: Google Chrome / Chromium ===
         elif self.browser == "chrome":
+            from selenium.webdriver.chrome.options import Options as ChromeOptions
+
             options = ChromeOptions()
 
+            # driver.get() retorna en DOMContentLoaded en vez de esperar
+            # cada subrecurso: el flujo ya sincroniza con waits sobre
+            # elementos concretos, así que el resto de la carga sobra.
+            options.page_load_strategy = "eager"
+            # No descargar imágenes (doble vía: flag de Blink y pref de
+            # perfil); el scraping solo lee tablas y formularios.
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+
             if self.headless:
                 options.add_argument("--headless")
                 options.add_argument("--disable-gpu")
 
+            # Perfil persistente: el arranque en frío de Chrome (spawn del
+            # proceso + init del perfil) domina el tiempo total en runs
+            # cortos. Reusar el perfil conserva la caché de disco y DNS
+            # entre ejecuciones.
+            user_data_dir = self.user_data_dir or os.path.join(
+                os.path.expanduser("~"), ".cache", "scraper-chrome"
+            )
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+            options.add_argument(
+                f"--disk-cache-dir={os.path.join(user_data_dir, 'disk-cache')}"
+            )
+
             # Ajustes recomendados para Jetson
             if self._is_jetson:
                 options.add_argument("--no-sandbox")
@@ -125,11 +167,14 @@ class WebDriverManager:
 
         # === Caso: Mozilla Firefox ===
         elif self.browser == "firefox":
+            from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
             options = FirefoxOptions()
 
-            # Modo headless
+            # Modo headless (options.headless está deprecado en Selenium 4
+            # y activa un camino legacy lento en algunos geckodriver)
             if self.headless:
-                options.headless = True
+                options.add_argument("-headless")
 
             # Crear Service
             service = self._create_firefox_service()
@@ -147,6 +192,8 @@ class WebDriverManager:
         """
         Crea el objeto Service para Microsoft Edge.
         """
+        from selenium.webdriver.edge.service import Service as EdgeService
+
         if self.driver_path:
             return EdgeService(executable_path=self.driver_path)
         # Asume que el path está en el PATH del sistema (p.e. /usr/bin)
@@ -158,14 +205,18 @@ class WebDriverManager:
         Si estamos en Jetson y no se especificó driver_path, se
         busca en rutas típicas (/usr/bin/chromedriver, etc.).
         """
+        from selenium.webdriver.chrome.service import Service as ChromeService
+
         driver_path = self.driver_path
 
         if not driver_path and self._is_jetson:
-            possible_paths = ["/usr/bin/chromedriver", "/usr/local/bin/chromedriver"]
-            for path in possible_paths:
-                if os.path.exists(path) and os.access(path, os.X_OK):
-                    driver_path = path
-                    break
+            if WebDriverManager._JETSON_CHROMEDRIVER is None:
+                possible_paths = ["/usr/bin/chromedriver", "/usr/local/bin/chromedriver"]
+                for path in possible_paths:
+                    if os.path.exists(path) and os.access(path, os.X_OK):
+                        WebDriverManager._JETSON_CHROMEDRIVER = path
+                        break
+            driver_path = WebDriverManager._JETSON_CHROMEDRIVER
 
         if driver_path:
             return ChromeService(executable_path=driver_path)
@@ -177,19 +228,40 @@ class WebDriverManager:
         Si estamos en Jetson y no se especificó driver_path, 
         se busca en rutas típicas (/usr/bin/geckodriver, etc.).
         """
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+
         driver_path = self.driver_path
 
         if not driver_path and self._is_jetson:
-            possible_paths = ["/usr/bin/geckodriver", "/usr/local/bin/geckodriver"]
-            for path in possible_paths:
-                if os.path.exists(path) and os.access(path, os.X_OK):
-                    driver_path = path
-                    break
+            if WebDriverManager._JETSON_GECKODRIVER is None:
+                possible_paths = ["/usr/bin/geckodriver", "/usr/local/bin/geckodriver"]
+                for path in possible_paths:
+                    if os.path.exists(path) and os.access(path, os.X_OK):
+                        WebDriverManager._JETSON_GECKODRIVER = path
+                        break
+            driver_path = WebDriverManager._JETSON_GECKODRIVER
 
         if driver_path:
             return FirefoxService(executable_path=driver_path)
         return FirefoxService()
 
+    def reuse(self, url: str):
+        """
+        Reutiliza el driver vivo navegando a `url`, evitando relanzar el
+        navegador. Retorna el driver si la sesión sigue respondiendo, o
+        None si no hay driver o la sesión murió (en cuyo caso el llamador
+        debe crear uno nuevo con init_driver).
+        """
+        if self.driver is None:
+            return None
+        try:
+            self.driver.get(url)
+            return self.driver
+        except WebDriverException:
+            logging.info("La sesión del navegador ya no responde; se creará una nueva.")
+            self.driver = None
+            return None
+
     def close_driver(self):
         """
         Cierra la instancia del WebDriver si está activa.
@@ -1,72 +1,167 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from WebDriverManager import WebDriverManager
-from DatasSelectionService import DataSelectionService
-from datetime import datetime
-import time
-import sys
-import os
-END_DATE = datetime(2025, 5,1)
-XPATHS={
-    'ButtonCentralMarginal':'//*[@id="dnn_ctr953_ModuleContent"]/div/ul/li[2]',
-    'CheckBox':'//div[contains(text(), "Ponderada")]',
-    'Button_yesterday':'/html/body/form/div[4]/div/section[2]/div[4]/div/div/div[1]/div[2]/div/div/div/div[2]/div/div/div/div/div[2]/div/div[1]/div[1]/div/div/div[1]/div[2]/div/i',
-    'Table':'/html/body/form/div[4]/div/section[2]/div[4]/div/div/div[1]/div[2]/div/div/div/div[2]/div/div/div/div/div[2]/div/div[2]/div/div[6]/div/table'
-
-}
-
-def check_date_validate():
-    now = datetime.now()
-    if now > END_DATE:
-        print("No se puede continuar. Error")
-        time.sleep(5)
-        sys.exit()  # Cierra el programa
-
-def init_workflow():
-    # Verificar la fecha antes de ejecutar el script
-    check_date_validate()
-    
-    browser = 'chrome'
-    web = WebDriverManager(browser=browser, headless=False)
-    web_driver = web.init_driver()
-
-    print('Cargando Pagina web....')
-    web_driver.get('https://www.oc.do/Servicios/Reporte/CostosMarginales')
-    wait = WebDriverWait(web_driver, 30)
-    time.sleep(0.5)
-
-
-    # Hacer clic en el botón Central Marginal
-    print('Click en el boton Central Marginal')
-    ButtonCentralMarginal = wait.until(EC.element_to_be_clickable((By.XPATH, XPATHS.get('ButtonCentralMarginal'))))
-    ButtonCentralMarginal.click()
-    time.sleep(0.5)
-
-    
-    # Hacer clic en el checkbox "Ponderada"
-    print('Haciendo Click en Ponderada')
-    CheckBox = wait.until(EC.element_to_be_clickable((By.XPATH, XPATHS.get('CheckBox'))))
-    CheckBox.click()
-    time.sleep(0.5)
-
-    # Hacer clic en el botón de ayer
-    print('Haciendo Click en Ayer')
-    Button_yesterday=wait.until(EC.element_to_be_clickable((By.XPATH, XPATHS.get('Button_yesterday'))))
-    Button_yesterday.click()
-    time.sleep(0.5)
-
-    now = datetime.now()
-    DataSelect = DataSelectionService(None, None, None, 10, int(now.day)-1, now.month, now.year, typology_key='Dominicana')
-    time.sleep(5)
-    print('Obteniendo datos')
-    DataSelect._extract_table(
-        wait, '', XPATHS.get('Table')
-    )
-
-    print('Cerrando Navegador')
-    time.sleep(2)
-    os._exit(0)
-
-
-init_workflow()
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from WebDriverManager import WebDriverManager
+from DatasSelectionService import DataSelectionService
+from DownloadService import DownloadService
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import shutil
+import tempfile
+import sys
+import os
+END_DATE = datetime(2025, 5,1)
+XPATHS={
+    'ButtonCentralMarginal':'//*[@id="dnn_ctr953_ModuleContent"]/div/ul/li[2]',
+    'CheckBox':'//div[contains(text(), "Ponderada")]',
+    'Table':'/html/body/form/div[4]/div/section[2]/div[4]/div/div/div[1]/div[2]/div/div/div/div[2]/div/div/div/div/div[2]/div/div[2]/div/div[6]/div/table'
+
+}
+# Localizadores resueltos una sola vez al importar el módulo.
+# 'Button_yesterday' usa CSS anclado al id del módulo: el XPATH absoluto de
+# 15 niveles se re-evaluaba completo en cada sondeo del wait y se rompía con
+# cualquier cambio de layout. 'Table' se mantiene como XPATH porque la
+# extracción localiza la tabla por XPATH dentro de la página.
+_LOCATORS = {k: (By.XPATH, v) for k, v in XPATHS.items()}
+_LOCATORS['Button_yesterday'] = (
+    By.CSS_SELECTOR, '#dnn_ctr953_ModuleContent .dx-datebox-icon'
+)
+
+REPORT_URL = 'https://www.oc.do/Servicios/Reporte/CostosMarginales'
+
+# Fija la fecha del reporte vía la API de DevExtreme (la página usa un
+# dx-datebox): el click en el icono solo deja la fecha por defecto, así
+# que las fechas explícitas de run_range necesitan este camino.
+_SET_REPORT_DATE_JS = """
+    const [anio, mes, dia] = arguments;
+    if (!window.DevExpress) { return 'sin-devextreme'; }
+    const el = document.querySelector('#dnn_ctr953_ModuleContent .dx-datebox');
+    if (!el) { return 'sin-datebox'; }
+    const inst = DevExpress.ui.dxDateBox.getInstance(el);
+    if (!inst) { return 'sin-instancia'; }
+    inst.option('value', new Date(anio, mes - 1, dia));
+    return 'ok';
+"""
+
+# Navegador caliente reutilizado entre ejecuciones del mismo proceso:
+# relanzar Chrome cuesta 1-3 s por run. Solo se usa en ejecuciones
+# secuenciales; run_range crea un navegador por hilo.
+_WEB = None
+
+
+def check_date_validate():
+    now = datetime.now()
+    if now > END_DATE:
+        print("No se puede continuar. Error")
+        sys.exit(1)  # Cierra el programa
+
+def init_workflow(date=None, headless=False, reuse_browser=True, user_data_dir=None):
+    # Verificar la fecha antes de ejecutar el script
+    check_date_validate()
+
+    browser = 'chrome'
+
+    print('Cargando Pagina web....')
+    # Reusar el navegador caliente si sigue vivo; si la sesión murió (o es
+    # la primera ejecución) se crea uno nuevo y se guarda para la próxima.
+    global _WEB
+    web = _WEB if reuse_browser else None
+    web_driver = web.reuse(REPORT_URL) if web is not None else None
+    if web_driver is None:
+        web = WebDriverManager(browser=browser, headless=headless,
+                               user_data_dir=user_data_dir)
+        web_driver = web.init_driver()
+        if reuse_browser:
+            _WEB = web
+        web_driver.get(REPORT_URL)
+
+    try:
+        # Sondeo a 50 ms e ignorando referencias stale transitorias
+        wait = WebDriverWait(
+            web_driver, 30, poll_frequency=0.05,
+            ignored_exceptions=(StaleElementReferenceException,)
+        )
+        # Los clicks iniciales se fusionan en una sola llamada JS
+        # asíncrona: el navegador espera a que cada elemento exista y lo
+        # pulsa, en vez de pares wait + click (2-3 round-trips cada uno)
+        # con sleeps intermedios.
+        selectors = [XPATHS['ButtonCentralMarginal'], XPATHS['CheckBox']]
+        if date is None:
+            # Sin fecha explícita se consulta el reporte por defecto
+            # (ayer), como en el flujo original.
+            selectors.append(_LOCATORS['Button_yesterday'][1])
+        print('Click en Central Marginal y Ponderada')
+        DownloadService.fused_click_sequence(web_driver, selectors)
+
+        if date is None:
+            now = datetime.now()
+            day, month, year = int(now.day) - 1, now.month, now.year
+        else:
+            # Fecha explícita: se fija en el datebox y el archivo se
+            # etiqueta con la fecha realmente consultada. Si no se puede
+            # fijar, se aborta en vez de guardar datos mal etiquetados.
+            print(f'Seleccionando fecha {date:%d-%m-%Y}')
+            old_table = web_driver.find_elements(*_LOCATORS['Table'])
+            result = web_driver.execute_script(
+                _SET_REPORT_DATE_JS, date.year, date.month, date.day
+            )
+            if result != 'ok':
+                raise RuntimeError(
+                    f"No se pudo fijar la fecha del reporte ({result})."
+                )
+            if old_table:
+                try:
+                    WebDriverWait(web_driver, 5).until(EC.staleness_of(old_table[0]))
+                except TimeoutException:
+                    pass
+            day, month, year = date.day, date.month, date.year
+
+        DataSelect = DataSelectionService(web_driver, None, None, 10, day, month, year, typology_key='Dominicana')
+        # Esperar a que la tabla esté en el DOM en lugar de dormir 5 s fijos
+        wait.until(EC.presence_of_element_located(_LOCATORS['Table']))
+        print('Obteniendo datos')
+        return DataSelect._extract_table(
+            XPATHS.get('Table'), ''
+        )
+    finally:
+        # El navegador caliente se deja vivo para la siguiente ejecución;
+        # los navegadores de run_range (un hilo cada uno) sí se cierran.
+        if not reuse_browser:
+            print('Cerrando Navegador')
+            web.close_driver()
+
+
+def run_range(dates):
+    """
+    Ejecuta init_workflow para varias fechas en paralelo (backfills).
+    Cada hilo levanta su propio navegador headless; el nombre del archivo
+    de salida incluye la fecha, así que no hay colisiones entre hilos.
+    Retorna la lista de rutas generadas, en el mismo orden que `dates`.
+    """
+    if not dates:
+        return []
+
+    def _scrape_date(d):
+        # Chrome bloquea el perfil por instancia: cada hilo usa un perfil
+        # temporal propio en lugar del perfil caliente compartido, y lo
+        # elimina al terminar (decenas de MB por fecha con el disk-cache).
+        profile_dir = tempfile.mkdtemp(prefix='scraper-chrome-')
+        try:
+            return init_workflow(d, headless=True, reuse_browser=False,
+                                 user_data_dir=profile_dir)
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(dates))) as executor:
+        return list(executor.map(_scrape_date, dates))
+
+
+if __name__ == '__main__':
+    init_workflow()
+    # Salida forzada: evita que hilos residuales del navegador dejen el
+    # proceso colgado al terminar.
+    os._exit(0)